@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from pathlib import Path
 
 from pydantic_settings import BaseSettings
@@ -8,12 +9,15 @@ class Settings(BaseSettings):
     BASE_DIR: Path = Path(__file__).parent.parent
     PATH_TO_DB: str = str(BASE_DIR / "database" / "source" / "movies.db")
     PATH_TO_MOVIES_CSV: str = str(BASE_DIR / "database" / "seed_data" / "imdb_movies.csv")
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
 
 
 class TestingSettings(Settings):
     PATH_TO_DB: str = ":memory:"
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> BaseSettings:
     """
     Retrieve the application settings based on the environment.
@@ -21,6 +25,7 @@ def get_settings() -> BaseSettings:
     This function checks the `ENVIRONMENT` environment variable to determine
     which settings class to use. If `ENVIRONMENT` is set to `"testing"`, it
     returns an instance of `TestingSettings`. Otherwise, it defaults to `Settings`.
+    The instance is created once and cached, so later calls do not re-read the environment.
 
     :return: An instance of the appropriate settings class.
     :rtype: BaseSettings
@@ -1,6 +1,10 @@
 from database.models import (
     Base,
-    MovieModel
+    MovieModel,
+    MovieTextModel,
+    StatsModel,
+    MOVIE_COUNT_STAT_KEY,
+    MOVIE_COUNT_TRIGGERS
 )
 from database.session import (
     init_db,
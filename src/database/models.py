@@ -1,7 +1,9 @@
 import datetime
 
-from sqlalchemy import String, Float, Text, DECIMAL, UniqueConstraint, Date
-from sqlalchemy.orm import DeclarativeBase, mapped_column, Mapped
+from sqlalchemy import String, Float, Text, DECIMAL, UniqueConstraint, Date, ForeignKey, Integer, DDL, event
+from sqlalchemy.orm import DeclarativeBase, mapped_column, Mapped, relationship
+
+MOVIE_COUNT_STAT_KEY = "movie_count"
 
 
 class Base(DeclarativeBase):
@@ -16,8 +18,6 @@ class MovieModel(Base):
     date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
     score: Mapped[float] = mapped_column(Float, nullable=False)
     genre: Mapped[str] = mapped_column(String(255), nullable=False)
-    overview: Mapped[str] = mapped_column(Text, nullable=False)
-    crew: Mapped[str] = mapped_column(Text, nullable=False)
     orig_title: Mapped[str] = mapped_column(String(255), nullable=False)
     status: Mapped[str] = mapped_column(String(50), nullable=False)
     orig_lang: Mapped[str] = mapped_column(String(50), nullable=False)
@@ -25,9 +25,59 @@ class MovieModel(Base):
     revenue: Mapped[float] = mapped_column(Float, nullable=False)
     country: Mapped[str] = mapped_column(String(3), nullable=False)
 
+    text: Mapped["MovieTextModel"] = relationship(back_populates="movie", cascade="all, delete-orphan")
+
     __table_args__ = (
         UniqueConstraint("name", "date", name="unique_movie_constraint"),
     )
 
     def __repr__(self):
         return f"<Movie(name='{self.name}', release_date='{self.date}', score={self.score})>"
+
+
+class MovieTextModel(Base):
+    """
+    Large text attributes of a movie, kept apart from `movies` so that the table
+    scanned by pagination and counting stays narrow.
+    """
+    __tablename__ = "movie_texts"
+
+    movie_id: Mapped[int] = mapped_column(ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True)
+    overview: Mapped[str] = mapped_column(Text, nullable=False)
+    crew: Mapped[str] = mapped_column(Text, nullable=False)
+
+    movie: Mapped[MovieModel] = relationship(back_populates="text")
+
+    def __repr__(self):
+        return f"<MovieText(movie_id={self.movie_id})>"
+
+
+class StatsModel(Base):
+    """
+    Precomputed counters keyed by name, e.g. `MOVIE_COUNT_STAT_KEY`, refreshed by the seeder
+    and kept in sync by `MOVIE_COUNT_TRIGGERS`, so that hot read paths do not have to run
+    aggregate queries.
+    """
+    __tablename__ = "stats"
+
+    key: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<Stats(key='{self.key}', value={self.value})>"
+
+
+# Keep the cached movie count in step with every insert and delete on `movies`. When the stats
+# row does not exist yet the updates are no-ops and readers fall back to COUNT(*).
+MOVIE_COUNT_TRIGGERS = tuple(
+    DDL(
+        f"CREATE TRIGGER IF NOT EXISTS movies_count_{operation.lower()} "
+        f"AFTER {operation} ON {MovieModel.__tablename__} "
+        f"BEGIN UPDATE {StatsModel.__tablename__} SET value = value {sign} 1 "
+        f"WHERE key = '{MOVIE_COUNT_STAT_KEY}'; END"
+    )
+    for operation, sign in (("INSERT", "+"), ("DELETE", "-"))
+)
+
+for trigger in MOVIE_COUNT_TRIGGERS:
+    event.listen(MovieModel.__table__, "after_create", trigger)
@@ -1,11 +1,98 @@
+from typing import AsyncIterator
+
 import pandas as pd
-from sqlalchemy import select, func
-from sqlalchemy.ext.asyncio import AsyncSession
+import pyarrow as pa
+from pyarrow import csv as pacsv
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection
 from sqlalchemy.exc import SQLAlchemyError
-from tqdm.asyncio import tqdm
+from tqdm import tqdm
 
 from config import get_settings
-from database import MovieModel, get_db_contextmanager, init_db
+from database import (
+    MovieModel,
+    MovieTextModel,
+    StatsModel,
+    MOVIE_COUNT_STAT_KEY,
+    get_db_contextmanager,
+    init_db
+)
+
+BATCH_SIZE = 1000
+CSV_BLOCK_SIZE = 16 * 1024 * 1024
+
+CSV_DTYPES = {
+    'names': pa.string(),
+    'date_x': pa.string(),
+    'score': pa.float64(),
+    'genre': pa.string(),
+    'overview': pa.string(),
+    'crew': pa.string(),
+    'orig_title': pa.string(),
+    'status': pa.string(),
+    'orig_lang': pa.string(),
+    'budget_x': pa.float64(),
+    'revenue': pa.float64(),
+    'country': pa.string(),
+}
+
+# CSV column -> model column
+FIELD_MAP = {
+    'names': 'name',
+    'date_x': 'date',
+    'score': 'score',
+    'genre': 'genre',
+    'overview': 'overview',
+    'crew': 'crew',
+    'orig_title': 'orig_title',
+    'status': 'status',
+    'orig_lang': 'orig_lang',
+    'budget_x': 'budget',
+    'revenue': 'revenue',
+    'country': 'country',
+}
+
+MOVIE_COLUMNS = (
+    'id',
+    'name',
+    'date',
+    'score',
+    'genre',
+    'orig_title',
+    'status',
+    'orig_lang',
+    'budget',
+    'revenue',
+    'country',
+)
+
+MOVIE_TEXT_COLUMNS = (
+    'movie_id',
+    'overview',
+    'crew',
+)
+
+INSERT_MOVIES_SQL = (
+    f"INSERT INTO {MovieModel.__tablename__} ({', '.join(MOVIE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in MOVIE_COLUMNS)})"
+)
+
+INSERT_MOVIE_TEXTS_SQL = (
+    f"INSERT INTO {MovieTextModel.__tablename__} ({', '.join(MOVIE_TEXT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in MOVIE_TEXT_COLUMNS)})"
+)
+REFRESH_MOVIE_COUNT_SQL = (
+    f"INSERT OR REPLACE INTO {StatsModel.__tablename__} (key, value) "
+    f"SELECT ?, COUNT(*) FROM {MovieModel.__tablename__}"
+)
+
+# The journal mode is left alone: the connections already run in WAL mode, and switching
+# away from it needs exclusive access to the database file.
+BULK_LOAD_PRAGMAS = {
+    'synchronous': 'OFF',
+    'temp_store': 'MEMORY',
+    'cache_size': '-200000',
+}
 
 
 class CSVDatabaseSeeder:
@@ -14,7 +101,7 @@ class CSVDatabaseSeeder:
 
     Attributes:
         _csv_file_path (str): Path to the CSV file containing movie data.
-        _db_session (AsyncSession): Asynchronous SQLAlchemy session for database operations.
+        _db_session (AsyncSession): Asynchronous SQLAlchemy session whose engine the data is loaded through.
     """
 
     def __init__(self, csv_file_path: str, db_session: AsyncSession):
@@ -23,7 +110,7 @@ class CSVDatabaseSeeder:
 
         :param csv_file_path: Path to the CSV file containing movie data.
         :type csv_file_path: str
-        :param db_session: Async database session for executing queries.
+        :param db_session: Async database session bound to the engine to seed.
         :type db_session: AsyncSession
         """
         self._csv_file_path = csv_file_path
@@ -36,37 +123,128 @@ class CSVDatabaseSeeder:
         :return: True if the database contains at least one record, False otherwise.
         :rtype: bool
         """
-        result = await self._db_session.execute(select(func.count()).select_from(MovieModel))
-        total_count = result.scalar_one()
-        return total_count > 0
+        result = await self._db_session.execute(select(MovieModel.id).limit(1))
+        return result.scalar_one_or_none() is not None
 
-    async def _preprocess_csv(self) -> pd.DataFrame:
+    async def _iter_chunks(self) -> AsyncIterator[pd.DataFrame]:
         """
-        Load and preprocess the CSV file before inserting data into the database.
+        Stream the CSV file in chunks and preprocess each chunk before inserting it into the database.
 
-        The function removes duplicate records based on 'names' and 'date_x',
-        replaces missing values, trims whitespace, and converts dates to a standard format.
+        The CSV is parsed by Arrow's streaming reader in blocks of `CSV_BLOCK_SIZE` bytes with
+        predeclared column types (`CSV_DTYPES`), so type inference is skipped and memory stays
+        bounded regardless of the file size. Each block is converted to an Arrow-backed DataFrame,
+        which keeps strings in Arrow buffers instead of allocating Python objects up front.
+        For every chunk the function replaces missing values, trims whitespace, converts dates
+        to ISO `YYYY-MM-DD` strings in one vectorized pass (the form SQLite stores them in),
+        and removes duplicate records based on 'names' and 'date_x'.
+        Already seen keys are tracked in a set, so duplicates are dropped across chunks as well.
 
-        :return: Preprocessed DataFrame containing the movie data.
-        :rtype: pd.DataFrame
+        :return: An async iterator yielding preprocessed DataFrame chunks.
+        :rtype: AsyncIterator[pd.DataFrame]
         """
-        data = pd.read_csv(self._csv_file_path)
-        data = data.drop_duplicates(subset=['names', 'date_x'], keep='first')
-        data['crew'] = data['crew'].fillna('Unknown')
-        data['genre'] = data['genre'].fillna('Unknown')
-        data['genre'] = data['genre'].str.replace('\u00A0', '', regex=True)
-        data['date_x'] = data['date_x'].str.strip()
-        data['date_x'] = pd.to_datetime(data['date_x'], format='%m/%d/%Y', errors='coerce')
-        data['date_x'] = data['date_x'].dt.date
         print("Preprocessing csv file")
-        return data
+        seen = set()
+        with pacsv.open_csv(
+            self._csv_file_path,
+            read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(
+                column_types=CSV_DTYPES,
+                include_columns=list(CSV_DTYPES),
+                strings_can_be_null=True
+            )
+        ) as reader:
+            for batch in reader:
+                data = batch.to_pandas(types_mapper=pd.ArrowDtype)
+                data['crew'] = data['crew'].fillna('Unknown')
+                data['genre'] = data['genre'].fillna('Unknown')
+                data['genre'] = data['genre'].str.replace('\u00A0', '', regex=True)
+                data['date_x'] = data['date_x'].str.strip()
+                data['date_x'] = pd.to_datetime(data['date_x'], format='%m/%d/%Y', errors='coerce')
+                data['date_x'] = data['date_x'].dt.strftime('%Y-%m-%d')
+
+                mask = []
+                for key in zip(data['names'], data['date_x']):
+                    mask.append(key not in seen)
+                    seen.add(key)
+                yield data[mask]
+
+    @staticmethod
+    def _to_rows(data: pd.DataFrame, first_id: int) -> tuple[list[tuple], list[tuple]]:
+        """
+        Convert a preprocessed DataFrame chunk into row tuples for `movies` and `movie_texts`.
+
+        Every CSV column is converted to a list once and looked up by its model name through
+        `FIELD_MAP`, without renaming or copying the chunk. Movie IDs are assigned explicitly,
+        starting from `first_id`, so that the text rows can reference their movie without
+        reading generated keys back.
+
+        :param data: Preprocessed DataFrame chunk.
+        :type data: pd.DataFrame
+        :param first_id: ID assigned to the first movie of the chunk.
+        :type first_id: int
+        :return: Movie rows ordered as `MOVIE_COLUMNS` and text rows ordered as `MOVIE_TEXT_COLUMNS`.
+        :rtype: tuple[list[tuple], list[tuple]]
+        """
+        values = {model_column: data[csv_column].tolist() for csv_column, model_column in FIELD_MAP.items()}
+        values['id'] = values['movie_id'] = list(range(first_id, first_id + len(data)))
+        movie_rows = list(zip(*(values[column] for column in MOVIE_COLUMNS)))
+        text_rows = list(zip(*(values[column] for column in MOVIE_TEXT_COLUMNS)))
+        return movie_rows, text_rows
+
+    @staticmethod
+    async def _set_pragmas(connection: AsyncConnection, pragmas: dict[str, str]) -> dict[str, str]:
+        """
+        Apply SQLite pragmas to the given connection.
+
+        Pragmas such as `synchronous` cannot be changed inside a transaction, so the
+        transaction implicitly started by these statements is committed right away.
+
+        :param connection: Connection the pragmas are applied to.
+        :type connection: AsyncConnection
+        :param pragmas: Mapping of pragma names to the values to set.
+        :type pragmas: dict[str, str]
+        :return: The values the pragmas had before they were changed.
+        :rtype: dict[str, str]
+        """
+        previous = {}
+        for name, value in pragmas.items():
+            previous[name] = str(await connection.scalar(text(f"PRAGMA {name}")))
+            await connection.exec_driver_sql(f"PRAGMA {name}={value}")
+        await connection.commit()
+        return previous
+
+    async def _load(self, connection: AsyncConnection) -> None:
+        """
+        Insert all CSV chunks and refresh the cached movie count on the given connection.
+
+        :param connection: Connection with an active transaction the rows are inserted in.
+        :type connection: AsyncConnection
+        """
+        next_id = await connection.scalar(select(func.coalesce(func.max(MovieModel.id), 0))) + 1
+        with tqdm(desc="Seeding database", unit="rows") as progress_bar:
+            async for data in self._iter_chunks():
+                movie_rows, text_rows = self._to_rows(data, next_id)
+                next_id += len(movie_rows)
+                for start in range(0, len(movie_rows), BATCH_SIZE):
+                    batch = movie_rows[start:start + BATCH_SIZE]
+                    await connection.exec_driver_sql(INSERT_MOVIES_SQL, batch)
+                    await connection.exec_driver_sql(INSERT_MOVIE_TEXTS_SQL, text_rows[start:start + BATCH_SIZE])
+                    progress_bar.update(len(batch))
+        await connection.exec_driver_sql(REFRESH_MOVIE_COUNT_SQL, (MOVIE_COUNT_STAT_KEY,))
 
     async def seed(self) -> None:
         """
         Seed the database with movie data from the CSV file.
 
-        The function reads the CSV, processes the data, and inserts it into the database.
-        It ensures that no duplicate records are inserted, and commits the transaction.
+        The function streams the CSV chunk by chunk and inserts the rows through the raw driver
+        `executemany` in batches of `BATCH_SIZE`, bypassing ORM and Core parameter processing.
+        Each movie row is written to `movies` and its overview and crew to `movie_texts`.
+        Progress is reported once per batch rather than once per row. The cached movie count
+        in `stats` is refreshed in the same transaction.
+        The load runs on a dedicated connection of the session's engine with `BULK_LOAD_PRAGMAS`
+        applied, and the previous pragma values are restored once the single insert transaction
+        covering all chunks is committed.
 
         :raises SQLAlchemyError: If an error occurs during database operations.
         :raises Exception: If any unexpected error occurs.
@@ -76,34 +254,18 @@ class CSVDatabaseSeeder:
                 print("Rolling back existing transaction.")
                 await self._db_session.rollback()
 
-            data = await self._preprocess_csv()
-
-            async with self._db_session.begin():
-                for _, row in tqdm(data.iterrows(), total=data.shape[0], desc="Seeding database"):
-                    movie = MovieModel(
-                        name=row['names'],
-                        date=row['date_x'],
-                        score=float(row['score']),
-                        genre=row['genre'],
-                        overview=row['overview'],
-                        crew=row['crew'],
-                        orig_title=row['orig_title'],
-                        status=row['status'],
-                        orig_lang=row['orig_lang'],
-                        budget=float(row['budget_x']),
-                        revenue=float(row['revenue']),
-                        country=row['country']
-                    )
-                    self._db_session.add(movie)
-
-            await self._db_session.commit()
+            async with self._db_session.bind.connect() as connection:
+                previous_pragmas = await self._set_pragmas(connection, BULK_LOAD_PRAGMAS)
+                try:
+                    async with connection.begin():
+                        await self._load(connection)
+                finally:
+                    await self._set_pragmas(connection, previous_pragmas)
         except SQLAlchemyError as e:
             print(f"An error occurred: {e}")
-            await self._db_session.rollback()
             raise
         except Exception as e:
             print(f"Unexpected error: {e}")
-            await self._db_session.rollback()
             raise
 
 
@@ -1,30 +1,123 @@
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Any
 
+from sqlalchemy import event, inspect, Connection
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from config import get_settings
-from database import Base
+from database import (
+    Base,
+    MovieModel,
+    MovieTextModel,
+    StatsModel,
+    MOVIE_COUNT_STAT_KEY,
+    MOVIE_COUNT_TRIGGERS
+)
 
 settings = get_settings()
 
 DATABASE_URL = f"sqlite+aiosqlite:///{settings.PATH_TO_DB}"
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+# File-backed databases already get a queue pool by default; the options below only make its
+# size configurable through settings. Every connection to ":memory:" opens its own empty database,
+# so the in-memory (testing) database keeps the dialect's default single shared connection.
+engine_options = {}
+if settings.PATH_TO_DB != ":memory:":
+    engine_options = {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": False,
+    }
+
+engine = create_async_engine(DATABASE_URL, echo=False, **engine_options)
 
 AsyncSQLiteSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)  # type: ignore
 
+SQLITE_CONNECTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "mmap_size": "268435456",
+    "foreign_keys": "ON",
+}
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    """
+    Apply `SQLITE_CONNECTION_PRAGMAS` to every new DBAPI connection.
+
+    WAL lets readers proceed while a writer is active, and `synchronous=NORMAL` is safe
+    in WAL mode while avoiding an fsync on every commit. Foreign keys are enforced so that
+    deleting a movie also removes its `movie_texts` row.
+    """
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_CONNECTION_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+LEGACY_MOVIE_TEXT_COLUMNS = ("overview", "crew")
+
+
+def migrate_movie_texts(connection: Connection) -> None:
+    """
+    Move `overview` and `crew` of a database created before `movie_texts` existed into that table.
+
+    Older databases keep both columns on `movies` and have no `movie_texts` rows, so the endpoints,
+    which join the two tables, would find no movies. The texts are copied into `movie_texts` and
+    the columns are dropped from `movies`. Databases already on the current schema are left untouched.
+
+    :param connection: Synchronous connection on which the tables have already been created.
+    :type connection: Connection
+    """
+    movie_columns = {column["name"] for column in inspect(connection).get_columns(MovieModel.__tablename__)}
+    if not movie_columns.issuperset(LEGACY_MOVIE_TEXT_COLUMNS):
+        return
+
+    connection.exec_driver_sql(
+        f"INSERT OR IGNORE INTO {MovieTextModel.__tablename__} (movie_id, overview, crew) "
+        f"SELECT id, overview, crew FROM {MovieModel.__tablename__}"
+    )
+    for column in LEGACY_MOVIE_TEXT_COLUMNS:
+        connection.exec_driver_sql(f"ALTER TABLE {MovieModel.__tablename__} DROP COLUMN {column}")
+
+
+def install_movie_count(connection: Connection) -> None:
+    """
+    Add the `MOVIE_COUNT_TRIGGERS` and the cached movie count to databases created before them.
+
+    The count row is only created when it is missing, so a count kept by the seeder and the
+    triggers is left as is. Without the row the triggers would have nothing to update.
+
+    :param connection: Synchronous connection on which the tables have already been created.
+    :type connection: Connection
+    """
+    for trigger in MOVIE_COUNT_TRIGGERS:
+        connection.execute(trigger)
+    connection.exec_driver_sql(
+        f"INSERT OR IGNORE INTO {StatsModel.__tablename__} (key, value) "
+        f"SELECT ?, COUNT(*) FROM {MovieModel.__tablename__}",
+        (MOVIE_COUNT_STAT_KEY,)
+    )
+
 
 async def init_db() -> None:
     """
     Initialize the database.
 
-    This function creates all tables defined in the SQLAlchemy ORM models.
+    This function creates all tables defined in the SQLAlchemy ORM models, migrates
+    databases created before `movie_texts` existed (see `migrate_movie_texts`) and installs
+    the cached movie count (see `install_movie_count`).
     It should be called at the application startup to ensure that the database schema exists.
     """
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(migrate_movie_texts)
+        await conn.run_sync(install_movie_count)
 
 
 async def close_db() -> None:
@@ -1,5 +1,6 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 from database.session import init_db, close_db
 from routes.movies import router as movie_router
@@ -15,7 +16,8 @@ async def lifespan(app: FastAPI):
 app = FastAPI(
     title="Movies homework",
     description="Description of project",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 api_version_prefix = "/api/v1"
@@ -1,40 +1,76 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.session import get_db
-from database.models import MovieModel
+from database.models import MovieModel, MovieTextModel, StatsModel, MOVIE_COUNT_STAT_KEY
 from schemas.movies import MovieListResponseSchema, MovieDetailResponseSchema
 
 router = APIRouter(prefix="/movies", tags=["Movies"])
 
+MOVIE_COLUMNS = (
+    MovieModel.id,
+    MovieModel.name,
+    MovieModel.date,
+    MovieModel.score,
+    MovieModel.genre,
+    MovieModel.orig_title,
+    MovieModel.status,
+    MovieModel.orig_lang,
+    MovieModel.budget,
+    MovieModel.revenue,
+    MovieModel.country,
+)
+
 
 @router.get("/", response_model=MovieListResponseSchema)
 async def get_movies(
     page: int = Query(1, ge=1, description="Page number (>=1)"),
     per_page: int = Query(10, ge=1, le=20, description="Number of movies per page"),
+    after_id: Optional[int] = Query(
+        None,
+        ge=0,
+        description="Return movies with ID greater than this one (keyset pagination, overrides `page`)"
+    ),
     db: AsyncSession = Depends(get_db)
 ):
-    total_items = await db.scalar(select(func.count()).select_from(MovieModel))
+    # The cached count (kept current by triggers on `movies`) is an O(1) lookup;
+    # COUNT(*) is only evaluated when it is missing.
+    total_items_subquery = func.coalesce(
+        select(StatsModel.value).where(StatsModel.key == MOVIE_COUNT_STAT_KEY).scalar_subquery(),
+        select(func.count()).select_from(MovieModel).scalar_subquery(),
+    )
+    page_query = select(*MOVIE_COLUMNS, total_items_subquery.label("total_items")).order_by(MovieModel.id)
+    if after_id is not None:
+        page_query = page_query.where(MovieModel.id > after_id).limit(per_page + 1)
+    else:
+        page_query = page_query.offset((page - 1) * per_page).limit(per_page)
 
-    offset = (page - 1) * per_page
-    result = await db.execute(
-        select(MovieModel)
-        .order_by(MovieModel.id)
-        .offset(offset)
-        .limit(per_page)
+    # Paginate over the narrow `movies` table first and join the text columns only for the page.
+    page_subquery = page_query.subquery()
+    stmt = (
+        select(page_subquery, MovieTextModel.overview, MovieTextModel.crew)
+        .join(MovieTextModel, MovieTextModel.movie_id == page_subquery.c.id)
+        .order_by(page_subquery.c.id)
     )
-    movies = result.scalars().all()
-    if not movies:
+
+    rows = (await db.execute(stmt)).mappings().all()
+    if not rows:
         raise HTTPException(status_code=404, detail="No movies found.")
 
+    movies = rows[:per_page]
+    total_items = rows[0]["total_items"]
     total_pages = (total_items + per_page - 1) // per_page
-    prev_page = f"/theater/movies/?page={page - 1}&per_page={per_page}" if page > 1 else None
-    next_page = f"/theater/movies/?page={page + 1}&per_page={per_page}" if page < total_pages else None
-
-    for m in movies:
-        if isinstance(m.revenue, float):
-            m.revenue = int(m.revenue)
+    if after_id is not None:
+        prev_page = None
+        next_page = None
+        if len(rows) > per_page:
+            next_page = f"/theater/movies/?after_id={movies[-1]['id']}&per_page={per_page}"
+    else:
+        prev_page = f"/theater/movies/?page={page - 1}&per_page={per_page}" if page > 1 else None
+        next_page = f"/theater/movies/?page={page + 1}&per_page={per_page}" if page < total_pages else None
 
     return {
         "movies": movies,
@@ -47,8 +83,12 @@ async def get_movies(
 
 @router.get("/{movie_id}/", response_model=MovieDetailResponseSchema)
 async def get_movie_by_id(movie_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(MovieModel).where(MovieModel.id == movie_id))
-    movie = result.scalar_one_or_none()
+    result = await db.execute(
+        select(*MOVIE_COLUMNS, MovieTextModel.overview, MovieTextModel.crew)
+        .join(MovieTextModel, MovieTextModel.movie_id == MovieModel.id)
+        .where(MovieModel.id == movie_id)
+    )
+    movie = result.mappings().one_or_none()
 
     if movie is None:
         raise HTTPException(status_code=404, detail="Movie with the given ID was not found.")
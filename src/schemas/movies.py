@@ -1,6 +1,6 @@
 from typing import List, Optional
 from datetime import date
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_validator
 
 
 class MovieDetailResponseSchema(BaseModel):
@@ -18,11 +18,12 @@ class MovieDetailResponseSchema(BaseModel):
     revenue: int
     country: str
 
-    class Config:
-        orm_mode = True
-        json_encoders = {
-            date: lambda v: v.isoformat(),
-        }
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("budget", "revenue", mode="before")
+    @classmethod
+    def truncate_to_int(cls, value: float) -> int:
+        return int(value)
 
 
 class MovieListResponseSchema(BaseModel):
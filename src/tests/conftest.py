@@ -1,60 +1,161 @@
+import shutil
+
+import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from pytest_asyncio import is_async_test
+from sqlalchemy import delete, event, select, func
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 from config import get_settings
 from database import (
-    reset_sqlite_database,
-    get_db_contextmanager,
+    Base,
+    get_db,
+    MovieModel,
 )
+from database.session import set_sqlite_pragmas
 from database.populate import CSVDatabaseSeeder
 from main import app
 
 
-@pytest_asyncio.fixture(scope="function", autouse=True)
-async def reset_db():
+def pytest_collection_modifyitems(items):
+    """
+    Run every async test in the session-scoped event loop.
+
+    The template database fixture is session-scoped and async, so tests and fixtures must
+    share a single event loop.
+    """
+    session_scope_marker = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_scope_marker, append=False)
+
+
+@pytest_asyncio.fixture(scope="session")
+async def movies_template_db(tmp_path_factory):
     """
-    Reset the SQLite database before each test.
+    Build a seeded template SQLite database file once per test session.
+
+    The schema is created and the seed data is inserted into `template.db`; every test then
+    works on its own copy of this file instead of reseeding the database. Under `pytest-xdist`
+    every worker gets its own temporary directory and therefore its own template.
 
-    This fixture ensures that the database is cleared and recreated for every test function.
-    It helps maintain test isolation by preventing data leakage between tests.
+    :return: Path to the seeded template database file.
     """
-    await reset_sqlite_database()
+    template_path = tmp_path_factory.mktemp("movies_template", numbered=True) / "template.db"
+    template_engine = create_async_engine(f"sqlite+aiosqlite:///{template_path}")
+
+    async with template_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    settings = get_settings()
+    async with async_sessionmaker(template_engine, expire_on_commit=False)() as session:
+        seeder = CSVDatabaseSeeder(csv_file_path=settings.PATH_TO_MOVIES_CSV, db_session=session)
+        await seeder.seed()
+
+    await template_engine.dispose()
+    return template_path
+
+
+@pytest_asyncio.fixture(scope="session")
+async def seed_stats(movies_template_db):
+    """
+    Provide the id bounds and the number of movies in the seeded template database.
+
+    The seed data does not change during the session, so the stats are queried only once.
+
+    :return: A dict with `min_id`, `max_id` and `total` keys.
+    """
+    template_engine = create_async_engine(f"sqlite+aiosqlite:///{movies_template_db}")
+    movie_id_column = MovieModel.__table__.c.id
+    async with template_engine.connect() as conn:
+        min_id, max_id, total = (
+            await conn.execute(select(func.min(movie_id_column), func.max(movie_id_column), func.count()))
+        ).one()
+    await template_engine.dispose()
+
+    return {"min_id": min_id, "max_id": max_id, "total": total}
 
 
 @pytest_asyncio.fixture(scope="function")
-async def client():
-    """Provide an asynchronous test client for making HTTP requests."""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as async_client:
-        yield async_client
+async def db_engine(movies_template_db, tmp_path):
+    """
+    Provide an async engine bound to a fresh copy of the template database.
+
+    Copying the file gives every test a fully isolated, already seeded database.
+    """
+    db_path = tmp_path / "test.db"
+    shutil.copyfile(movies_template_db, db_path)
+
+    test_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    event.listen(test_engine.sync_engine, "connect", set_sqlite_pragmas)
+    yield test_engine
+    await test_engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def db_session_factory(db_engine):
+    """Provide a session factory bound to the test's database copy."""
+    return async_sessionmaker(db_engine, expire_on_commit=False)
+
+
+@pytest_asyncio.fixture(scope="function", autouse=True)
+async def override_get_db(db_session_factory):
+    """
+    Point the application's `get_db` dependency at the test's database copy.
+
+    The client is shared by the whole session, so the override is swapped in for every test
+    instead of being tied to the client's lifetime.
+    """
+    async def get_test_db():
+        async with db_session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_db
+    yield
+    app.dependency_overrides.pop(get_db, None)
 
 
 @pytest_asyncio.fixture(scope="function")
-async def db_session():
+async def db_session(db_session_factory):
     """
-    Provide an async database session for database interactions.
+    Provide an async database session bound to the test's database copy.
 
-    This fixture yields an async session using `get_db_contextmanager`, ensuring that the session
-    is properly closed after each test.
+    The endpoints under test open their sessions on the same copy, so the test and the
+    application see the same data.
     """
-    async with get_db_contextmanager() as session:
+    async with db_session_factory() as session:
         yield session
 
 
 @pytest_asyncio.fixture(scope="function")
 async def seed_database(db_session):
     """
-    Seed the database with test data if it is empty.
+    Provide the database session for tests that rely on the seed data.
 
-    This fixture initializes a `CSVDatabaseSeeder` and ensures the test database is populated before
-    running tests that require existing data.
+    Every test database is a copy of the seeded template, so nothing has to be inserted here.
 
     :param db_session: The async database session fixture.
     :type db_session: AsyncSession
     """
-    settings = get_settings()
-    seeder = CSVDatabaseSeeder(csv_file_path=settings.PATH_TO_MOVIES_CSV, db_session=db_session)
+    yield db_session
 
-    if not await seeder.is_db_populated():
-        await seeder.seed()
 
-    yield db_session
+@pytest_asyncio.fixture(scope="function")
+async def empty_database(db_session):
+    """Remove all movies from the test's database copy."""
+    await db_session.execute(delete(MovieModel))
+    await db_session.commit()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client():
+    """
+    Provide an asynchronous test client for making HTTP requests.
+
+    A single client and ASGI transport are shared by every test in the session, and the
+    application's lifespan is entered once around them, so startup and shutdown run only once.
+    """
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as async_client:
+            yield async_client
@@ -1,12 +1,41 @@
+import asyncio
+import csv
 import random
+import shutil
+import orjson
 import pytest
-from sqlalchemy import select, func
-
-from database import MovieModel
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from database import Base, MovieModel, MovieTextModel, StatsModel, MOVIE_COUNT_STAT_KEY, get_db
+from database import populate
+from database.populate import CSVDatabaseSeeder
+from database.session import migrate_movie_texts, install_movie_count
+from config import get_settings
+from main import app
+
+LIST_URL = "/api/v1/theater/movies/"
+DETAIL_URL_TMPL = "/api/v1/theater/movies/{id}/"
+
+FIELDS = (
+    "id",
+    "name",
+    "date",
+    "score",
+    "genre",
+    "overview",
+    "crew",
+    "orig_title",
+    "status",
+    "orig_lang",
+    "budget",
+    "revenue",
+    "country",
+)
 
 
 @pytest.mark.asyncio
-async def test_get_movies_empty_database(client):
+async def test_get_movies_empty_database(client, empty_database):
     """
     Test retrieving movies from an empty database.
 
@@ -14,26 +43,22 @@ async def test_get_movies_empty_database(client):
         - 404 response status code.
         - JSON response with a "No movies found." error.
     """
-    response = await client.get("/api/v1/theater/movies/")
+    response = await client.get(LIST_URL)
 
     assert response.status_code == 404
-    assert response.json() == {"detail": "No movies found."}
 
+    response_data = orjson.loads(response.content)
+    assert response_data == {"detail": "No movies found."}
 
-@pytest.mark.asyncio
-async def test_get_movies_default_parameters(client, seed_database):
+
+def check_default_parameters(response_data, params):
     """
-    Test retrieving movies with default pagination parameters.
+    Default pagination parameters.
 
     Expected:
-        - 200 response status code.
         - 10 movies returned (default `per_page`).
         - Pagination metadata (`total_pages`, `total_items`, `prev_page`, `next_page`).
     """
-    response = await client.get("/api/v1/theater/movies/")
-    assert response.status_code == 200
-
-    response_data = response.json()
     assert len(response_data["movies"]) == 10
     assert response_data["total_pages"] > 0
     assert response_data["total_items"] > 0
@@ -42,23 +67,17 @@ async def test_get_movies_default_parameters(client, seed_database):
         assert response_data["next_page"] is not None
 
 
-@pytest.mark.asyncio
-async def test_get_movies_with_custom_parameters(client, seed_database):
+def check_custom_parameters(response_data, params):
     """
-    Test retrieving movies with custom pagination parameters.
+    Custom pagination parameters (`page`, `per_page` taken from `params`).
 
     Expected:
-        - 200 response status code.
         - Requested number of movies (`per_page`).
         - Correct `prev_page` and `next_page` links based on pagination.
     """
-    page = 2
-    per_page = 5
-
-    response = await client.get(f"/api/v1/theater/movies/?page={page}&per_page={per_page}")
-    assert response.status_code == 200
+    page = params["page"]
+    per_page = params["per_page"]
 
-    response_data = response.json()
     assert len(response_data["movies"]) == per_page
     assert response_data["total_pages"] > 0
     assert response_data["total_items"] > 0
@@ -70,46 +89,136 @@ async def test_get_movies_with_custom_parameters(client, seed_database):
         assert response_data["next_page"] is None
 
 
+def check_per_page_maximum_allowed_value(response_data, params):
+    """
+    Maximum allowed `per_page` value.
+
+    Expected:
+        - At most `per_page` movies in the response.
+    """
+    assert "movies" in response_data
+    assert len(response_data["movies"]) <= params["per_page"]
+
+
 @pytest.mark.asyncio
-@pytest.mark.parametrize("page, per_page, expected_detail", [
-    (0, 10, "Input should be greater than or equal to 1"),
-    (1, 0, "Input should be greater than or equal to 1"),
-    (0, 0, "Input should be greater than or equal to 1"),
+@pytest.mark.parametrize("params, check", [
+    pytest.param({}, check_default_parameters, id="default_parameters"),
+    pytest.param({"page": 2, "per_page": 5}, check_custom_parameters, id="custom_parameters"),
+    pytest.param({"page": 1, "per_page": 20}, check_per_page_maximum_allowed_value, id="per_page_maximum_allowed_value"),
 ])
-async def test_invalid_page_and_per_page(client, page, per_page, expected_detail):
+async def test_list_endpoint(client, seed_database, params, check):
     """
-    Test invalid pagination parameters.
+    Test retrieving movies with different pagination parameters.
 
     Expected:
-        - 422 response status code.
-        - JSON validation error with the expected message.
+        - 200 response status code.
+        - Response data passing the case-specific `check` for the requested `params`.
     """
-    response = await client.get(f"/api/v1/theater/movies/?page={page}&per_page={per_page}")
-    assert response.status_code == 422
+    response = await client.get(LIST_URL, params=params)
+    assert response.status_code == 200
+
+    response_data = orjson.loads(response.content)
+    check(response_data, params)
+
+
+@pytest.mark.asyncio
+async def test_pagination_matrix(client, seed_database):
+    """
+    Test several `page`/`per_page` combinations with concurrent requests.
+
+    Expected:
+        - 200 response status code for every combination.
+        - `per_page` movies per page and `total_pages` consistent with `total_items`.
+        - `prev_page` only set past the first page.
+    """
+    combinations = [(page, per_page) for page in (1, 2) for per_page in (5, 10, 20)]
+    responses = await asyncio.gather(
+        *(client.get(LIST_URL, params={"page": page, "per_page": per_page}) for page, per_page in combinations)
+    )
+
+    for (page, per_page), response in zip(combinations, responses):
+        assert response.status_code == 200
 
-    response_data = response.json()
-    assert any(expected_detail in error["msg"] for error in response_data["detail"])
+        response_data = orjson.loads(response.content)
+        assert len(response_data["movies"]) == per_page
+        assert response_data["total_pages"] == (response_data["total_items"] + per_page - 1) // per_page
+        if page > 1:
+            assert response_data["prev_page"] is not None
+        else:
+            assert response_data["prev_page"] is None
 
 
 @pytest.mark.asyncio
-async def test_per_page_maximum_allowed_value(client, seed_database):
+async def test_total_items_follows_movie_deletes(client, db_session, seed_database, seed_stats):
     """
-    Test retrieving movies with the maximum allowed `per_page` value.
+    Test that `total_items` reflects movies deleted after seeding.
 
     Expected:
         - 200 response status code.
-        - A maximum of 20 movies in the response.
+        - `total_items` one lower than the seeded movie count.
     """
-    response = await client.get("/api/v1/theater/movies/?page=1&per_page=20")
+    await db_session.execute(delete(MovieModel).where(MovieModel.id == seed_stats["min_id"]))
+    await db_session.commit()
+
+    response = await client.get(LIST_URL)
     assert response.status_code == 200
 
-    response_data = response.json()
-    assert "movies" in response_data
-    assert len(response_data["movies"]) <= 20
+    response_data = orjson.loads(response.content)
+    assert response_data["total_items"] == seed_stats["total"] - 1
+
+
+@pytest.mark.asyncio
+async def test_get_movies_with_after_id(client, seed_database):
+    """
+    Test retrieving movies with keyset pagination (`after_id`).
+
+    Expected:
+        - 200 response status code.
+        - The same movies as the equivalent offset-based page.
+        - `next_page` link continuing after the last returned movie.
+    """
+    per_page = 5
+
+    first_page = orjson.loads((await client.get(LIST_URL, params={"page": 1, "per_page": per_page})).content)
+    second_page = orjson.loads((await client.get(LIST_URL, params={"page": 2, "per_page": per_page})).content)
+    last_id = first_page["movies"][-1]["id"]
+
+    response = await client.get(LIST_URL, params={"after_id": last_id, "per_page": per_page})
+    assert response.status_code == 200
+
+    response_data = orjson.loads(response.content)
+    assert response_data["movies"] == second_page["movies"]
+    assert response_data["total_items"] == second_page["total_items"]
+    assert response_data["prev_page"] is None
+    assert response_data["next_page"] == (
+        f"/theater/movies/?after_id={response_data['movies'][-1]['id']}&per_page={per_page}"
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("page, per_page, expected_detail", [
+    (0, 10, "Input should be greater than or equal to 1"),
+    (1, 0, "Input should be greater than or equal to 1"),
+    (0, 0, "Input should be greater than or equal to 1"),
+])
+async def test_invalid_page_and_per_page(client, page, per_page, expected_detail):
+    """
+    Test invalid pagination parameters.
+
+    Expected:
+        - 422 response status code.
+        - JSON validation error with the expected message.
+    """
+    response = await client.get(LIST_URL, params={"page": page, "per_page": per_page})
+    assert response.status_code == 422
+
+    response_data = orjson.loads(response.content)
+    msgs = [error["msg"] for error in response_data["detail"]]
+    assert any(expected_detail in msg for msg in msgs)
 
 
 @pytest.mark.asyncio
-async def test_page_exceeds_maximum(client, db_session, seed_database):
+async def test_page_exceeds_maximum(client, seed_database, seed_stats):
     """
     Test retrieving a page number that exceeds the total available pages.
 
@@ -118,16 +227,17 @@ async def test_page_exceeds_maximum(client, db_session, seed_database):
         - JSON response with a "No movies found." error.
     """
     per_page = 10
-    total_movies = await db_session.scalar(select(func.count()).select_from(MovieModel))
-    max_page = (total_movies + per_page - 1) // per_page
+    max_page = (seed_stats["total"] + per_page - 1) // per_page
 
-    response = await client.get(f"/api/v1/theater/movies/?page={max_page + 1}&per_page={per_page}")
+    response = await client.get(LIST_URL, params={"page": max_page + 1, "per_page": per_page})
     assert response.status_code == 404
-    assert response.json()["detail"] == "No movies found."
+
+    response_data = orjson.loads(response.content)
+    assert response_data["detail"] == "No movies found."
 
 
 @pytest.mark.asyncio
-async def test_get_movie_by_id_not_found(client):
+async def test_get_movie_by_id_not_found(client, empty_database):
     """
     Test retrieving a movie by an ID that does not exist.
 
@@ -136,13 +246,15 @@ async def test_get_movie_by_id_not_found(client):
         - JSON response with a "Movie with the given ID was not found." error.
     """
     movie_id = 1
-    response = await client.get(f"/api/v1/theater/movies/{movie_id}/")
+    response = await client.get(DETAIL_URL_TMPL.format(id=movie_id))
     assert response.status_code == 404
-    assert response.json() == {"detail": "Movie with the given ID was not found."}
+
+    response_data = orjson.loads(response.content)
+    assert response_data == {"detail": "Movie with the given ID was not found."}
 
 
 @pytest.mark.asyncio
-async def test_get_movie_by_id_valid(client, db_session, seed_database):
+async def test_get_movie_by_id_valid(client, db_session, seed_database, seed_stats):
     """
     Test retrieving a valid movie by ID.
 
@@ -150,27 +262,112 @@ async def test_get_movie_by_id_valid(client, db_session, seed_database):
         - 200 response status code.
         - JSON response containing the correct movie details.
     """
-    min_id = (await db_session.execute(select(MovieModel.id).order_by(MovieModel.id.asc()))).scalars().first()
-    max_id = (await db_session.execute(select(MovieModel.id).order_by(MovieModel.id.desc()))).scalars().first()
-    random_id = random.randint(min_id, max_id)
+    rng = random.Random(0)
+    random_id = rng.randint(seed_stats["min_id"], seed_stats["max_id"])
+
+    expected_result, response = await asyncio.gather(
+        db_session.execute(
+            select(MovieModel.__table__, MovieTextModel.overview, MovieTextModel.crew)
+            .join(MovieTextModel)
+            .where(MovieModel.id == random_id)
+        ),
+        client.get(DETAIL_URL_TMPL.format(id=random_id)),
+    )
+    assert response.status_code == 200
+
+    expected_movie = expected_result.mappings().one()
+    expected = {field: expected_movie[field] for field in FIELDS}
+    expected["date"] = str(expected["date"])
+    expected["budget"] = int(expected["budget"])
+    expected["revenue"] = int(expected["revenue"])
+    response_data = orjson.loads(response.content)
+    assert response_data == expected
+
 
-    expected_movie = await db_session.get(MovieModel, random_id)
-    assert expected_movie is not None
+@pytest.mark.asyncio
+async def test_legacy_schema_is_migrated(client, tmp_path):
+    """
+    Test serving movies from a database created before `movie_texts` existed.
 
-    response = await client.get(f"/api/v1/theater/movies/{random_id}/")
+    Expected:
+        - `overview` and `crew` are moved from `movies` into `movie_texts` on startup.
+        - 200 response status code with the migrated texts.
+        - The cached movie count is created and follows later inserts.
+    """
+    legacy_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    async with legacy_engine.begin() as conn:
+        await conn.exec_driver_sql(
+            "CREATE TABLE movies ("
+            "id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, date DATE NOT NULL, score FLOAT NOT NULL, "
+            "genre VARCHAR(255) NOT NULL, overview TEXT NOT NULL, crew TEXT NOT NULL, "
+            "orig_title VARCHAR(255) NOT NULL, status VARCHAR(50) NOT NULL, orig_lang VARCHAR(50) NOT NULL, "
+            "budget DECIMAL(10, 2) NOT NULL, revenue FLOAT NOT NULL, country VARCHAR(3) NOT NULL)"
+        )
+        await conn.exec_driver_sql(
+            "INSERT INTO movies VALUES "
+            "(1, 'Movie', '2023-01-01', 70, 'Drama', 'An overview', 'A crew', 'Movie', 'Released', 'English', "
+            "1000, 2000, 'AU')"
+        )
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(migrate_movie_texts)
+        await conn.run_sync(install_movie_count)
+        await conn.exec_driver_sql(
+            "INSERT INTO movies VALUES "
+            "(2, 'Sequel', '2024-01-01', 70, 'Drama', 'Sequel', 'Released', 'English', 1000, 2000, 'AU')"
+        )
+        movie_count = await conn.scalar(select(StatsModel.value).where(StatsModel.key == MOVIE_COUNT_STAT_KEY))
+
+    session_factory = async_sessionmaker(legacy_engine, expire_on_commit=False)
+
+    async def get_legacy_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_legacy_db
+    try:
+        response = await client.get(DETAIL_URL_TMPL.format(id=1))
+    finally:
+        await legacy_engine.dispose()
     assert response.status_code == 200
 
-    response_data = response.json()
-    assert response_data["id"] == expected_movie.id
-    assert response_data["name"] == expected_movie.name
-    assert response_data["date"] == str(expected_movie.date)
-    assert response_data["score"] == expected_movie.score
-    assert response_data["genre"] == expected_movie.genre
-    assert response_data["overview"] == expected_movie.overview
-    assert response_data["crew"] == expected_movie.crew
-    assert response_data["orig_title"] == expected_movie.orig_title
-    assert response_data["status"] == expected_movie.status
-    assert response_data["orig_lang"] == expected_movie.orig_lang
-    assert response_data["budget"] == float(expected_movie.budget)
-    assert response_data["revenue"] == expected_movie.revenue
-    assert response_data["country"] == expected_movie.country
+    response_data = orjson.loads(response.content)
+    assert response_data["overview"] == "An overview"
+    assert response_data["crew"] == "A crew"
+    assert movie_count == 2
+
+
+@pytest.mark.asyncio
+async def test_seed_across_csv_blocks(monkeypatch, tmp_path, seed_stats):
+    """
+    Test seeding when the CSV is read in many small blocks.
+
+    Expected:
+        - The same number of movies as a single-block load.
+        - Every (`name`, `date`) pair stored once, including a duplicate placed in a later block.
+    """
+    monkeypatch.setattr(populate, "CSV_BLOCK_SIZE", 64 * 1024)
+
+    # Repeat the first movie at the end of the file so that the duplicate lands in another block.
+    csv_path = tmp_path / "movies.csv"
+    shutil.copyfile(get_settings().PATH_TO_MOVIES_CSV, csv_path)
+    with open(csv_path, newline="", encoding="utf-8") as csv_file:
+        reader = csv.reader(csv_file)
+        next(reader)
+        first_movie = next(reader)
+    with open(csv_path, "a", newline="", encoding="utf-8") as csv_file:
+        csv.writer(csv_file).writerow(first_movie)
+
+    seed_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'blocks.db'}")
+    async with seed_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(seed_engine, expire_on_commit=False)() as session:
+        await CSVDatabaseSeeder(csv_file_path=str(csv_path), db_session=session).seed()
+        total = await session.scalar(select(func.count()).select_from(MovieModel))
+        unique_pairs = await session.scalar(
+            select(func.count()).select_from(select(MovieModel.name, MovieModel.date).distinct().subquery())
+        )
+    await seed_engine.dispose()
+
+    assert total == seed_stats["total"]
+    assert unique_pairs == total